@@ -0,0 +1,250 @@
+# Sebastian Thomas (coding at sebastianthomas dot de)
+
+# operating system
+from os import environ
+
+# benchmarks never show a window
+environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+# command line interface
+from argparse import ArgumentParser
+
+# serialization
+from json import dump, load
+
+# randomization
+from random import choice, seed, shuffle
+
+# subprocesses
+from subprocess import run as run_process
+from sys import executable
+
+# time measurement
+from time import perf_counter
+from timeit import Timer
+
+# games
+from tictactoe.tictactoe import TicTacToe
+from ultimate_tictactoe.ultimate_tictactoe import UltimateTicTacToe
+from pong.pong import Pong
+from pong_squash.pong_squash import PongSquash
+from pong_arena.pong_arena import PongArena, MAX_PLAYERS
+
+
+# constants
+N_REPEATS = 5
+N_IMPORT_REPEATS = 5
+THRESHOLD = 0.1  # relative slowdown that counts as regression
+MODULES = ('tictactoe.tictactoe', 'ultimate_tictactoe.ultimate_tictactoe',
+           'pong.pong', 'pong_squash.pong_squash', 'pong_arena.pong_arena')
+
+
+def _tictactoe_midgame():
+    """Returns a tic-tac-toe game with a partially filled board and the
+    position of its last move, whose player is still active, as when the
+    game checks the move."""
+    game = TicTacToe()
+    for pos in (5, 1, 9):
+        game._update_board(pos)
+        game._first_player_active = not game._first_player_active
+    game._update_board(3)
+    return game, 3
+
+
+def bench_tictactoe_is_won():
+    """Checking for a win after a move."""
+    game, pos = _tictactoe_midgame()
+    return lambda: game._is_won(pos)
+
+
+def bench_tictactoe_is_tie():
+    """Checking for a tie after a move."""
+    game, _ = _tictactoe_midgame()
+    return game._is_tie
+
+
+def bench_tictactoe_random_game():
+    """Playing a full tic-tac-toe game with random moves."""
+    positions = list(range(1, 10))
+    seed(0)
+
+    def play():
+        """Plays one game."""
+        game = TicTacToe()
+        shuffle(positions)
+        for pos in positions:
+            game._update_board(pos)
+            game._update_status(pos)
+            if game._is_finished:
+                break
+            game._first_player_active = not game._first_player_active
+
+    return play
+
+
+def bench_ultimate_tictactoe_random_game():
+    """Playing and taking back a full ultimate tic-tac-toe game with random
+    moves."""
+    game = UltimateTicTacToe()
+    seed(0)
+
+    def play():
+        """Plays one game and takes back all of its moves."""
+        n_moves = 0
+        while not game._is_finished:
+            game.play(choice(game.legal_moves()))
+            n_moves += 1
+        for _ in range(n_moves):
+            game.undo()
+
+    return play
+
+
+def _stepper(game):
+    """Returns a function that steps the game and restarts it when it is
+    over. The ball is still served again after each point, but the redraw
+    of the screen that comes with it is patched out, so that only the
+    physics is timed."""
+    game._redraw_screen = lambda: None
+    seed(0)
+    game.restart()
+
+    def step():
+        """Steps the game."""
+        if not game.is_active:
+            game.restart()
+        game.step()
+
+    return step
+
+
+def bench_pong_step():
+    """One time step of the Pong physics."""
+    return _stepper(Pong(offscreen=True))
+
+
+def bench_pong_squash_step():
+    """One time step of the PongSquash physics."""
+    return _stepper(PongSquash(offscreen=True))
+
+
+def bench_pong_arena_step():
+    """One time step of the physics of a full Pong arena."""
+    return _stepper(PongArena(MAX_PLAYERS, offscreen=True))
+
+
+def bench_pong_redraw_screen():
+    """Redrawing one Pong frame."""
+    return Pong()._redraw_screen
+
+
+def bench_pong_redraw_screen_4k():
+    """Redrawing one Pong frame scaled to a 4K display."""
+    return Pong(display_size=(3840, 2160))._redraw_screen
+
+
+def bench_pong_squash_redraw_screen():
+    """Redrawing one PongSquash frame."""
+    return PongSquash()._redraw_screen
+
+
+BENCHMARKS = {
+    'tictactoe_is_won': bench_tictactoe_is_won,
+    'tictactoe_is_tie': bench_tictactoe_is_tie,
+    'tictactoe_random_game': bench_tictactoe_random_game,
+    'ultimate_tictactoe_random_game': bench_ultimate_tictactoe_random_game,
+    'pong_step': bench_pong_step,
+    'pong_squash_step': bench_pong_squash_step,
+    'pong_arena_step': bench_pong_arena_step,
+    'pong_redraw_screen': bench_pong_redraw_screen,
+    'pong_redraw_screen_4k': bench_pong_redraw_screen_4k,
+    'pong_squash_redraw_screen': bench_pong_squash_redraw_screen,
+}
+
+
+def time_function(function, n_repeats=N_REPEATS):
+    """Returns the best time in seconds of one call of the function."""
+    timer = Timer(function)
+    n_calls, _ = timer.autorange()
+    return min(timer.repeat(n_repeats, n_calls)) / n_calls
+
+
+def time_import(module, n_repeats=N_IMPORT_REPEATS):
+    """Returns the best time in seconds of importing the module in a fresh
+    interpreter, excluding the startup of the interpreter itself."""
+    def best_time(code):
+        """Returns the best time of running the code."""
+        times = []
+        for _ in range(n_repeats):
+            start = perf_counter()
+            run_process([executable, '-c', code], check=True,
+                        capture_output=True)
+            times.append(perf_counter() - start)
+        return min(times)
+
+    return max(0., best_time('import ' + module) - best_time('pass'))
+
+
+def run_benchmarks(names=None):
+    """Runs the benchmarks and returns the seconds per operation by
+    name."""
+    results = {}
+    for name, benchmark in BENCHMARKS.items():
+        if names is None or name in names:
+            results[name] = time_function(benchmark())
+    for module in MODULES:
+        name = 'import_' + module.split('.')[0]
+        if names is None or name in names:
+            results[name] = time_import(module)
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Returns the names of the benchmarks that are slower than in the
+    baseline by more than the threshold, with their relative change."""
+    return {name: results[name] / baseline[name] - 1
+            for name in results.keys() & baseline.keys()
+            if results[name] > (1 + threshold) * baseline[name]}
+
+
+def print_results(results, baseline=None):
+    """Prints the results and their change relative to the baseline."""
+    width = max(map(len, results), default=0)
+    for name, seconds in results.items():
+        line = '{:>{}}: {:12.3f} us'.format(name, width, 1e6 * seconds)
+        if baseline is not None and name in baseline:
+            line += '  {:+7.1%}'.format(seconds / baseline[name] - 1)
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmarks the hot paths of the '
+                                        'games.')
+    parser.add_argument('benchmarks', nargs='*',
+                        help='names of benchmarks to run, default all')
+    parser.add_argument('--save', metavar='PATH',
+                        help='store the results as JSON baseline')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='compare the results with a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='relative slowdown that counts as regression')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.benchmarks or None)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = load(file)
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            dump(results, file, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, change in sorted(regressions.items()):
+            print('regression: {} is {:.1%} slower'.format(name, change))
+        if regressions:
+            raise SystemExit(1)
@@ -0,0 +1,78 @@
+# Sebastian Thomas (coding at sebastianthomas dot de)
+
+# numerical arrays
+from numpy import arange, take, uint8, zeros
+
+# python gaming framework
+from pygame.surface import Surface
+from pygame.surfarray import pixels3d, pixels_red
+from pygame.transform import grayscale, smoothscale
+
+
+# constants
+OBSERVATION_WIDTH = 84
+OBSERVATION_HEIGHT = 84
+N_STACKED_FRAMES = 4
+
+
+class PixelObservation:
+    """Observes the rendered frames of a Pong or PongSquash game as NumPy
+    arrays.
+
+    The full frame is a view of the pixels of the screen of the game. Reduced
+    observations are downsampled to grayscale into preallocated surfaces and
+    written into a ring buffer of the last frames, so observing does not
+    allocate. Games created with offscreen=True can be observed without a
+    window, e.g. on headless machines with the SDL dummy video driver.
+
+    Only offscreen games and games shown at their logical size include the
+    scores and labels in the observed frames. Games scaled to another
+    display size draw their text after scaling directly into the window, so
+    their screen holds no text."""
+
+    def __init__(self, game, width=OBSERVATION_WIDTH,
+                 height=OBSERVATION_HEIGHT, n_stacked=N_STACKED_FRAMES):
+        """Initializes observation of the game."""
+        self._screen = game.screen
+
+        # the scaled surfaces share the pixel format of the screen
+        self._scaled = Surface((width, height), 0, self._screen)
+        self._gray = Surface((width, height), 0, self._screen)
+
+        self._frames = zeros((n_stacked, height, width), dtype=uint8)
+        self._stacked = zeros((n_stacked, height, width), dtype=uint8)
+        self._index = 0
+
+    def frame(self):
+        """Returns the current frame as a view of shape (height, width, 3) of
+        the pixels of the screen. The screen stays locked, and thus cannot be
+        drawn on, until the view is deleted."""
+        return pixels3d(self._screen).transpose(1, 0, 2)
+
+    def observe(self):
+        """Downsamples the current frame to grayscale, stores it in the ring
+        buffer and returns it. The returned array is overwritten once the
+        ring buffer wraps around."""
+        smoothscale(self._screen, self._scaled.get_size(), self._scaled)
+        grayscale(self._scaled, self._gray)
+
+        # all color channels of a gray pixel agree
+        gray = pixels_red(self._gray)
+        observation = self._frames[self._index]
+        observation[...] = gray.T
+        del gray
+
+        self._index = (self._index + 1) % len(self._frames)
+        return observation
+
+    def stacked(self):
+        """Returns the last observed frames, oldest first, as an array of
+        shape (n_stacked, height, width). The returned array is overwritten
+        by the next call."""
+        order = (arange(len(self._frames)) + self._index) % len(self._frames)
+        return take(self._frames, order, axis=0, out=self._stacked)
+
+    def reset(self):
+        """Clears the ring buffer."""
+        self._frames[...] = 0
+        self._index = 0
@@ -14,6 +14,9 @@ from pygame.rect import Rect
 from pygame.draw import circle as draw_circle, rect as draw_rect, \
     line as draw_line
 from pygame.event import get as get_event
+from pygame.surface import Surface
+from pygame.transform import scale as scale_surface, \
+    smoothscale as smoothscale_surface
 from pygame.math import Vector2
 from pygame.time import Clock, wait
 
@@ -27,7 +30,9 @@ WINDOW_HEIGHT = 480
 WINDOW_COLOR = 0, 0, 0  # black
 
 init_pygame_fonts()
-FONT = SysFont('couriernewbold', 50, bold=False)
+FONT_NAME = 'couriernewbold'
+FONT_SIZE = 50
+FONT = SysFont(FONT_NAME, FONT_SIZE, bold=False)
 FONT_COLOR = 255, 255, 255  # white
 
 SCORE1_LABEL_LEFT \
@@ -75,6 +80,102 @@ def draw_dashed_line(surface, color, start_pos, end_pos, width=1,
         draw_line(surface, color, start, end, width)
 
 
+class ScaledDisplay:
+    """Display of a surface of logical size in a window of any size.
+
+    Games draw on the logical surface, which is scaled once per frame into a
+    cached subsurface centered in the window. Windows at least as large as
+    the logical size get the largest integral scale, which keeps the edges
+    sharp and is cheaper than smooth scaling by arbitrary factors. Text is
+    composed of glyphs rendered once at the scaled font size and drawn after
+    scaling, so that it stays crisp; scaled text is thus drawn on top of
+    everything on the logical surface, e.g. the ball and the paddles,
+    regardless of the drawing order. Without a display size, nothing is
+    shown; at the logical size, the window itself is the logical surface."""
+
+    def __init__(self, logical_size, display_size=None, font_name=FONT_NAME):
+        """Initializes display, opening a window of the display size if it is
+        given."""
+        self._font_name = font_name
+        self._fonts = {}
+        self._glyphs = {}
+        # glyphs and positions to be drawn after scaling
+        self._texts = []
+
+        self._window = None
+        self._target = None
+        self._scale = 1
+        if display_size is None:
+            self._surface = Surface(logical_size)
+        elif tuple(display_size) == tuple(logical_size):
+            self._window = set_mode_of_screen(size=logical_size)
+            self._surface = self._window
+        else:
+            self._window = set_mode_of_screen(size=display_size)
+            self._surface = Surface(logical_size)
+
+            self._scale = min(display_size[0] / logical_size[0],
+                              display_size[1] / logical_size[1])
+            if self._scale >= 1:
+                self._scale = int(self._scale)
+                self._scale_surface = scale_surface
+            else:
+                self._scale_surface = smoothscale_surface
+            size = (round(logical_size[0] * self._scale),
+                    round(logical_size[1] * self._scale))
+            self._target = self._window.subsurface(
+                Rect(((display_size[0] - size[0]) // 2,
+                      (display_size[1] - size[1]) // 2), size))
+
+    @property
+    def surface(self):
+        """Returns the surface of logical size."""
+        return self._surface
+
+    def _font(self, font_size):
+        """Returns the font of the logical font size at the scale of this
+        instance."""
+        size = round(font_size * self._scale)
+        if size not in self._fonts:
+            self._fonts[size] = SysFont(self._font_name, size, bold=False)
+        return self._fonts[size]
+
+    def _glyph(self, char, font_size, color):
+        """Returns the glyph of the character at the scale of this
+        instance."""
+        key = char, font_size, color
+        if key not in self._glyphs:
+            self._glyphs[key] = self._font(font_size).render(char, True,
+                                                             color)
+        return self._glyphs[key]
+
+    def draw_text(self, text, position, font_size, color=FONT_COLOR):
+        """Draws the text at the logical position."""
+        if self._target is None:
+            self._surface.blit(self._font(font_size).render(text, True, color),
+                               position)
+            return
+
+        left = round(position[0] * self._scale)
+        top = round(position[1] * self._scale)
+        for char in text:
+            glyph = self._glyph(char, font_size, color)
+            self._texts.append((glyph, (left, top)))
+            left += glyph.get_width()
+
+    def flip(self):
+        """Shows the logical surface and the text in the window."""
+        if self._window is None:
+            return
+
+        if self._target is not None:
+            self._scale_surface(self._surface, self._target.get_size(),
+                                self._target)
+            self._target.blits(self._texts, doreturn=False)
+            self._texts.clear()
+        flip_screen()
+
+
 class Pong:
     """Class that implements the classical arcade game Pong by Atari."""
 
@@ -175,12 +276,30 @@ class Pong:
             """Returns the color of this instance."""
             return self._color
 
-    def __init__(self):
-        """Initializes Pong game."""
+    def __init__(self, on_frame=None, offscreen=False, display_size=None):
+        """Initializes Pong game. If given, on_frame is called with the
+        instance after each time step. If offscreen is true, the instance is
+        drawn on a surface that is not shown in a window. Otherwise, it is
+        drawn at the size of the constants and shown scaled to the display
+        size, if given."""
         init_pygame()
-        self._screen = set_mode_of_screen(size=(WINDOW_WIDTH, WINDOW_HEIGHT))
-        set_caption_of_screen('Pong')
-
+        self._is_offscreen = offscreen
+        if offscreen:
+            display_size = None
+        elif display_size is None:
+            display_size = WINDOW_WIDTH, WINDOW_HEIGHT
+        self._display = ScaledDisplay((WINDOW_WIDTH, WINDOW_HEIGHT),
+                                      display_size)
+        self._screen = self._display.surface
+        if not offscreen:
+            set_caption_of_screen('Pong')
+
+        self._on_frame = on_frame
+
+        self.restart()
+
+    def restart(self):
+        """Restarts the game with the initial paddles, ball and scores."""
         self._paddle1 = self.Paddle(PADDLE1_INITIAL_LEFT, PADDLES_INITIAL_TOP)
         self._paddle2 = self.Paddle(PADDLE2_INITIAL_LEFT, PADDLES_INITIAL_TOP)
         self._ball = self.Ball(velocity=(choice(BALL_VELOCITY_CHOICES),
@@ -192,12 +311,28 @@ class Pong:
         self._is_active = True
 
     @property
-    def _label1(self):
-        return FONT.render('{:2d}'.format(self._score1), True, FONT_COLOR)
+    def is_active(self):
+        """Checks whether the game is still running."""
+        return self._is_active
 
     @property
-    def _label2(self):
-        return FONT.render('{:2d}'.format(self._score2), True, FONT_COLOR)
+    def screen(self):
+        """Returns the surface this instance is drawn on."""
+        return self._screen
+
+    @property
+    def state(self):
+        """Returns the tops of the paddles, the rectangle of the ball and the
+        scores as a tuple of integers."""
+        return (self._paddle1.top, self._paddle2.top, *self._ball,
+                self._score1, self._score2)
+
+    def _draw_labels(self):
+        """Draws the labels of the scores."""
+        self._display.draw_text('{:2d}'.format(self._score1),
+                                SCORE1_LABEL_POSITION, FONT_SIZE)
+        self._display.draw_text('{:2d}'.format(self._score2),
+                                SCORE2_LABEL_POSITION, FONT_SIZE)
 
     def _redraw_screen(self):
         """Redraws the screen."""
@@ -205,8 +340,7 @@ class Pong:
         self._screen.fill(WINDOW_COLOR)
 
         # draw labels
-        self._screen.blit(self._label1, SCORE1_LABEL_POSITION)
-        self._screen.blit(self._label2, SCORE2_LABEL_POSITION)
+        self._draw_labels()
 
         # draw net
         draw_dashed_line(self._screen, NET_COLOR, (NET_X, 0),
@@ -219,7 +353,7 @@ class Pong:
                     self._ball.radius)
 
         # update whole screen
-        flip_screen()
+        self._display.flip()
 
     def _move_paddles_and_ball(self):
         """Updates coordinates of the paddles and of the ball to the values
@@ -283,6 +417,36 @@ class Pong:
                     <= self._paddle2.bottom:
                 self._ball.right = self._paddle2.left
 
+    def steer(self, velocity1, velocity2):
+        """Sets the velocities of the paddles, limited to the maximal
+        velocity."""
+        self._paddle1.velocity = max(-MAX_VELOCITY,
+                                     min(velocity1, MAX_VELOCITY))
+        self._paddle2.velocity = max(-MAX_VELOCITY,
+                                     min(velocity2, MAX_VELOCITY))
+
+    def step(self):
+        """Updates the paddles and the ball by one time step."""
+        # update coordinates of paddles and ball
+        self._move_paddles_and_ball()
+
+        # handle collisions of paddles with walls and of ball with walls and
+        # paddles
+        self._handle_wall_collision()
+        self._handle_paddles_ball_collision()
+
+        # notify observer of the new state
+        if self._on_frame is not None:
+            self._on_frame(self)
+
+    def render(self):
+        """Draws the current frame on the screen, or the game over screen
+        once the game is over."""
+        if self.is_active:
+            self._redraw_screen()
+        else:
+            self._draw_game_over_screen()
+
     def _reset(self):
         """Resets the properties of the paddle and of the ball to their
         initial values, respectively, and redraws the screen."""
@@ -297,8 +461,9 @@ class Pong:
         # redraw screen
         self._redraw_screen()
 
-        # wait until game continues
-        wait(RESTART_TIME)
+        # wait until game continues, unless nobody is watching
+        if not self._is_offscreen:
+            wait(RESTART_TIME)
 
     def _draw_game_over_screen(self):
         """Draws the game over screen."""
@@ -306,21 +471,19 @@ class Pong:
         self._screen.fill(WINDOW_COLOR)
 
         # draw labels
-        self._screen.blit(self._label1, SCORE1_LABEL_POSITION)
-        self._screen.blit(self._label2, SCORE2_LABEL_POSITION)
+        self._draw_labels()
 
         # draw game over label
         winner = '1' if self._score1 > self._score2 else '2'
-        winner_label = FONT.render('PLAYER {} WON'.format(winner), True,
-                                   FONT_COLOR)
-        self._screen.blit(winner_label, WINNER_LABEL_POSITION)
+        self._display.draw_text('PLAYER {} WON'.format(winner),
+                                WINNER_LABEL_POSITION, FONT_SIZE)
 
         # draw paddles
         draw_rect(self._screen, self._paddle1.color, self._paddle1)
         draw_rect(self._screen, self._paddle2.color, self._paddle2)
 
         # update whole screen
-        flip_screen()
+        self._display.flip()
 
     def run(self):
         """Runs the instance."""
@@ -358,13 +521,8 @@ class Pong:
                     if event.key == K_UP or event.key == K_DOWN:
                         self._paddle2.velocity = 0
 
-            # update coordinates of paddles and ball
-            self._move_paddles_and_ball()
-
-            # handle collisions of paddles with walls and of ball with
-            # walls and paddles
-            self._handle_wall_collision()
-            self._handle_paddles_ball_collision()
+            # update paddles and ball
+            self.step()
 
             # set count of updates
             clock.tick(FRAMES_PER_SECOND)
@@ -0,0 +1,442 @@
+# Sebastian Thomas (coding at sebastianthomas dot de)
+
+# randomization
+from random import choice
+
+# python gaming framework
+from pygame import init as init_pygame, quit as quit_pygame, \
+    get_init as pygame_is_active
+from pygame.constants import QUIT, KEYDOWN, KEYUP, K_w, K_s, K_UP, K_DOWN, \
+    K_c, K_v, K_LEFT, K_RIGHT, K_i, K_k, K_KP8, K_KP2, K_n, K_m, K_KP4, K_KP6
+from pygame.display import set_caption as set_caption_of_screen
+from pygame.draw import circle as draw_circle, rect as draw_rect, \
+    line as draw_line
+from pygame.event import get as get_event
+from pygame.time import Clock, wait
+
+# two player pong
+from pong.pong import Pong, ScaledDisplay, FRAMES_PER_SECOND, RESTART_TIME, \
+    WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_COLOR, FONT, FONT_SIZE, FONT_COLOR, \
+    MAX_VELOCITY, BALL_VELOCITY_CHOICES
+
+
+# constants
+MIN_PLAYERS = 4
+MAX_PLAYERS = 8
+N_LIVES = 5
+
+ARENA_SIZE = WINDOW_HEIGHT
+ARENA_LEFT = (WINDOW_WIDTH - ARENA_SIZE) // 2
+ARENA_RIGHT = ARENA_LEFT + ARENA_SIZE
+ARENA_TOP = 0
+ARENA_BOTTOM = ARENA_SIZE
+ARENA_CENTER = (ARENA_LEFT + ARENA_RIGHT) // 2, (ARENA_TOP + ARENA_BOTTOM) // 2
+WALL_COLOR = 211, 211, 211
+WALL_WIDTH = 3
+
+# sides of the arena, players are assigned to them in this order
+LEFT, RIGHT, TOP, BOTTOM = range(4)
+# axis on which the ball approaches each side, 0 for x and 1 for y, sign of
+# the normal of each side pointing into the arena and coordinate of each side
+SIDE_AXES = 0, 0, 1, 1
+SIDE_NORMALS = 1, -1, 1, -1
+SIDE_COORDINATES = ARENA_LEFT, ARENA_RIGHT, ARENA_TOP, ARENA_BOTTOM
+# speeds along a wall the ball may take after bouncing off it
+BALL_SPEEDS = tuple(v for v in BALL_VELOCITY_CHOICES if v > 0)
+
+LABEL_FONT_SIZE = 24
+LABELS_TOP = 10
+LABELS_SPACING = 60
+WINNER_LABEL = FONT.render('PLAYER 0 WON', True, FONT_COLOR)
+WINNER_LABEL_POSITION = (WINDOW_WIDTH - WINNER_LABEL.get_width()) // 2, \
+                        (WINDOW_HEIGHT - WINNER_LABEL.get_height()) // 2
+
+PADDLE_LENGTH = 60
+PADDLE_THICKNESS = 15
+PADDLE_INSET = 10  # distance of the paddles from their side
+
+PLAYER_COLORS = (
+    (255, 40, 0),  # red
+    (0, 120, 255),  # blue
+    (0, 200, 70),  # green
+    (255, 150, 0),  # orange
+    (180, 70, 255),  # purple
+    (0, 220, 220),  # cyan
+    (255, 90, 180),  # pink
+    (160, 110, 60),  # brown
+)
+# keys moving the paddle of each player up or left, and down or right
+PLAYER_KEYS = (
+    (K_w, K_s),
+    (K_UP, K_DOWN),
+    (K_c, K_v),
+    (K_LEFT, K_RIGHT),
+    (K_i, K_k),
+    (K_KP8, K_KP2),
+    (K_n, K_m),
+    (K_KP4, K_KP6),
+)
+
+
+class PongArena:
+    """Class that implements a party variant of the classical arcade game
+    Pong by Atari for four to eight players on a square arena.
+
+    Every player guards a segment of a side of the arena and loses a life
+    whenever the ball leaves through it; the segments of eliminated players
+    become walls, which send the ball back at a random speed along them.
+    Paddles, lives and inputs are held in arrays indexed by player, so that
+    all players are handled by the same loops."""
+
+    def __init__(self, n_players=MIN_PLAYERS, on_frame=None, offscreen=False,
+                 display_size=None):
+        """Initializes Pong arena for n_players players. If given, on_frame
+        is called with the instance after each time step. If offscreen is
+        true, the instance is drawn on a surface that is not shown in a
+        window. Otherwise, it is drawn at the size of the constants and shown
+        scaled to the display size, if given."""
+        if not MIN_PLAYERS <= n_players <= MAX_PLAYERS:
+            raise ValueError('number of players must be between {} and {}'
+                             .format(MIN_PLAYERS, MAX_PLAYERS))
+
+        init_pygame()
+        self._is_offscreen = offscreen
+        if offscreen:
+            display_size = None
+        elif display_size is None:
+            display_size = WINDOW_WIDTH, WINDOW_HEIGHT
+        self._display = ScaledDisplay((WINDOW_WIDTH, WINDOW_HEIGHT),
+                                      display_size)
+        self._screen = self._display.surface
+        if not offscreen:
+            set_caption_of_screen('Pong Arena')
+
+        self._n_players = n_players
+        # side of each player and segment of that side guarded by it
+        self._sides = [player % 4 for player in range(n_players)]
+        self._segments = []
+        for player, side in enumerate(self._sides):
+            owners = [owner for owner in range(n_players)
+                      if self._sides[owner] == side]
+            length = ARENA_SIZE // len(owners)
+            origin = ARENA_TOP if self._is_vertical(side) else ARENA_LEFT
+            rank = owners.index(player)
+            self._segments.append((origin + rank*length,
+                                   origin + (rank + 1)*length))
+        # player and direction of each key
+        self._keys = {key: (player, direction)
+                      for player, keys in enumerate(PLAYER_KEYS[:n_players])
+                      for direction, key in zip((-1, 1), keys)}
+
+        self._on_frame = on_frame
+
+        self.restart()
+
+    @staticmethod
+    def _is_vertical(side):
+        """Checks whether the side is vertical, i.e. whether its paddles move
+        up and down."""
+        return side == LEFT or side == RIGHT
+
+    def _initial_paddle(self, player):
+        """Returns the paddle of the player in the middle of its segment."""
+        side = self._sides[player]
+        start, end = self._segments[player]
+        offset = (start + end - PADDLE_LENGTH) // 2
+        color = PLAYER_COLORS[player]
+
+        if side == LEFT:
+            return Pong.Paddle(ARENA_LEFT + PADDLE_INSET, offset,
+                               PADDLE_THICKNESS, PADDLE_LENGTH, color=color)
+        if side == RIGHT:
+            return Pong.Paddle(ARENA_RIGHT - PADDLE_INSET - PADDLE_THICKNESS,
+                               offset, PADDLE_THICKNESS, PADDLE_LENGTH,
+                               color=color)
+        if side == TOP:
+            return Pong.Paddle(offset, ARENA_TOP + PADDLE_INSET,
+                               PADDLE_LENGTH, PADDLE_THICKNESS, color=color)
+        return Pong.Paddle(offset,
+                           ARENA_BOTTOM - PADDLE_INSET - PADDLE_THICKNESS,
+                           PADDLE_LENGTH, PADDLE_THICKNESS, color=color)
+
+    def restart(self):
+        """Restarts the game with the initial paddles, ball and lives."""
+        self._paddles = [self._initial_paddle(player)
+                         for player in range(self._n_players)]
+        self._lives = [N_LIVES] * self._n_players
+        self._ball = Pong.Ball(center=ARENA_CENTER,
+                               velocity=(choice(BALL_VELOCITY_CHOICES),
+                                         choice(BALL_VELOCITY_CHOICES)))
+
+    @property
+    def n_players(self):
+        """Returns the number of players."""
+        return self._n_players
+
+    @property
+    def is_active(self):
+        """Checks whether more than one player is left."""
+        return sum(lives > 0 for lives in self._lives) > 1
+
+    @property
+    def screen(self):
+        """Returns the surface this instance is drawn on."""
+        return self._screen
+
+    @property
+    def state(self):
+        """Returns the positions of the paddles along their sides, the
+        rectangle of the ball and the lives as a tuple of integers."""
+        return (*(paddle.top if self._is_vertical(side) else paddle.left
+                  for paddle, side in zip(self._paddles, self._sides)),
+                *self._ball, *self._lives)
+
+    def _owner(self, side, position):
+        """Returns the player guarding the given position along the side."""
+        # positions beyond the corners belong to the outermost segments
+        origin = ARENA_TOP if self._is_vertical(side) else ARENA_LEFT
+        position = max(origin, min(position, origin + ARENA_SIZE - 1))
+        for player, (start, end) in enumerate(self._segments):
+            if self._sides[player] == side and start <= position < end:
+                return player
+
+    def _draw_arena(self):
+        """Draws the labels, the walls of eliminated players and the paddles
+        of the remaining players."""
+        # fill background with window color
+        self._screen.fill(WINDOW_COLOR)
+
+        for player, (paddle, side, (start, end), lives) \
+                in enumerate(zip(self._paddles, self._sides, self._segments,
+                                 self._lives)):
+            # draw label, players 1 to 4 on the left, 5 to 8 on the right
+            self._display.draw_text(
+                'P{}:{}'.format(player + 1, lives),
+                (5 if player < 4 else ARENA_RIGHT + 5,
+                 LABELS_TOP + (player % 4)*LABELS_SPACING),
+                LABEL_FONT_SIZE, PLAYER_COLORS[player])
+
+            # draw paddle or, if player is eliminated, wall
+            if lives > 0:
+                draw_rect(self._screen, paddle.color, paddle)
+            else:
+                if side == LEFT:
+                    start_pos, end_pos = (ARENA_LEFT, start), (ARENA_LEFT, end)
+                elif side == RIGHT:
+                    start_pos, end_pos = (ARENA_RIGHT - 1, start), \
+                                         (ARENA_RIGHT - 1, end)
+                elif side == TOP:
+                    start_pos, end_pos = (start, ARENA_TOP), (end, ARENA_TOP)
+                else:
+                    start_pos, end_pos = (start, ARENA_BOTTOM - 1), \
+                                         (end, ARENA_BOTTOM - 1)
+                draw_line(self._screen, WALL_COLOR, start_pos, end_pos,
+                          WALL_WIDTH)
+
+    def _redraw_screen(self):
+        """Redraws the screen."""
+        self._draw_arena()
+
+        # draw ball
+        draw_circle(self._screen, self._ball.color, self._ball.center,
+                    self._ball.radius)
+
+        # update whole screen
+        self._display.flip()
+
+    def _move_paddles_and_ball(self):
+        """Updates coordinates of the paddles and of the ball to the values
+        after one time step."""
+        # update paddles
+        for paddle, side in zip(self._paddles, self._sides):
+            if self._is_vertical(side):
+                paddle.top += paddle.velocity
+            else:
+                paddle.left += paddle.velocity
+        # update ball
+        self._ball.left += self._ball.velocity_x
+        self._ball.top += self._ball.velocity_y
+
+    def _handle_wall_collision(self):
+        """Handles collisions of the paddles with the ends of their segments
+        and of the ball with the walls of eliminated players, as well as the
+        reset after the ball leaves through the segment of a player."""
+        # collision of paddles with the ends of their segments
+        for paddle, side, (start, end) in zip(self._paddles, self._sides,
+                                              self._segments):
+            if self._is_vertical(side):
+                paddle.top = max(start, min(paddle.top, end - paddle.height))
+            else:
+                paddle.left = max(start, min(paddle.left, end - paddle.width))
+
+        ball = self._ball
+        for side, (axis, normal, coordinate) in enumerate(
+                zip(SIDE_AXES, SIDE_NORMALS, SIDE_COORDINATES)):
+            # edges of the ball facing the side and facing away from it
+            near, far = self._span(ball, axis)[::normal]
+            if normal * (near - coordinate) >= 0:
+                continue
+
+            owner = self._owner(side, ball.center[1 - axis])
+            if self._lives[owner] == 0:
+                # collision of ball with wall of eliminated player, which
+                # changes the speed along the wall, so that the ball cannot
+                # bounce between walls forever
+                self._move_ball_to(side, coordinate)
+                self._reflect_ball(side)
+                velocity = list(ball.velocity)
+                speed = choice(BALL_SPEEDS)
+                velocity[1 - axis] = speed if velocity[1 - axis] > 0 \
+                    else -speed
+                ball.velocity = tuple(velocity)
+            elif normal * (far - coordinate) < 0:
+                # ball leaves through segment of owner
+                self._lives[owner] -= 1
+                if self.is_active:
+                    self._reset()
+                return
+
+    def _handle_paddles_ball_collision(self):
+        """Handles collisions of the ball with the paddles."""
+        ball = self._ball
+        for paddle, side, lives in zip(self._paddles, self._sides,
+                                       self._lives):
+            if lives == 0 or not paddle.colliderect(ball):
+                continue
+
+            # reflect ball only if it moves towards the side of the paddle and
+            # push it out of the paddle if it hit the front of the paddle
+            axis, normal = SIDE_AXES[side], SIDE_NORMALS[side]
+            if normal * ball.velocity[axis] < 0:
+                self._reflect_ball(side)
+                start, end = self._span(paddle, 1 - axis)
+                if start <= ball.center[1 - axis] <= end:
+                    # edge of the paddle facing away from the side
+                    _, front = self._span(paddle, axis)[::normal]
+                    self._move_ball_to(side, front)
+
+    @staticmethod
+    def _span(rect, axis):
+        """Returns the lowest and the highest coordinate of the rectangle
+        along the axis."""
+        if axis == 0:
+            return rect.left, rect.right
+        return rect.top, rect.bottom
+
+    def _move_ball_to(self, side, coordinate):
+        """Moves the ball along the axis of the side, so that its edge facing
+        the side lies at the coordinate."""
+        axis, normal = SIDE_AXES[side], SIDE_NORMALS[side]
+        offset = [0, 0]
+        offset[axis] = coordinate - self._span(self._ball, axis)[::normal][0]
+        self._ball.move_ip(offset)
+
+    def _reflect_ball(self, side):
+        """Lets the ball move away from the side."""
+        axis, normal = SIDE_AXES[side], SIDE_NORMALS[side]
+        velocity = list(self._ball.velocity)
+        velocity[axis] = normal * abs(velocity[axis])
+        self._ball.velocity = tuple(velocity)
+
+    def steer(self, *velocities):
+        """Sets the velocities of the paddles, limited to the maximal
+        velocity."""
+        for paddle, velocity in zip(self._paddles, velocities):
+            paddle.velocity = max(-MAX_VELOCITY, min(velocity, MAX_VELOCITY))
+
+    def step(self):
+        """Updates the paddles and the ball by one time step."""
+        # update coordinates of paddles and ball
+        self._move_paddles_and_ball()
+
+        # handle collisions of paddles with walls and of ball with walls and
+        # paddles
+        self._handle_wall_collision()
+        self._handle_paddles_ball_collision()
+
+        # notify observer of the new state
+        if self._on_frame is not None:
+            self._on_frame(self)
+
+    def render(self):
+        """Draws the current frame on the screen, or the game over screen
+        once the game is over."""
+        if self.is_active:
+            self._redraw_screen()
+        else:
+            self._draw_game_over_screen()
+
+    def _reset(self):
+        """Resets the velocities of the paddles and the properties of the
+        ball to their initial values, respectively, and redraws the
+        screen."""
+        # reset paddles
+        for paddle in self._paddles:
+            paddle.velocity = 0
+        # reset ball
+        self._ball.center = ARENA_CENTER
+        self._ball.velocity_x = choice(BALL_VELOCITY_CHOICES)
+        self._ball.velocity_y = choice(BALL_VELOCITY_CHOICES)
+
+        # redraw screen
+        self._redraw_screen()
+
+        # wait until game continues, unless nobody is watching
+        if not self._is_offscreen:
+            wait(RESTART_TIME)
+
+    def _draw_game_over_screen(self):
+        """Draws the game over screen."""
+        self._draw_arena()
+
+        # draw game over label
+        winner = max(range(self._n_players),
+                     key=lambda player: self._lives[player])
+        self._display.draw_text('PLAYER {} WON'.format(winner + 1),
+                                WINNER_LABEL_POSITION, FONT_SIZE)
+
+        # update whole screen
+        self._display.flip()
+
+    def run(self):
+        """Runs the instance."""
+        clock = Clock()
+
+        while self.is_active:
+            # redraw screen
+            self._redraw_screen()
+
+            # check for events
+            for event in get_event():
+                # clicking quit button of window kills the game
+                if event.type == QUIT:
+                    quit_pygame()
+
+                # clicking key board button to move paddle of its player
+                if event.type == KEYDOWN and event.key in self._keys:
+                    player, direction = self._keys[event.key]
+                    self._paddles[player].velocity = direction * MAX_VELOCITY
+                if event.type == KEYUP and event.key in self._keys:
+                    player, direction = self._keys[event.key]
+                    if self._paddles[player].velocity \
+                            == direction * MAX_VELOCITY:
+                        self._paddles[player].velocity = 0
+
+            # update paddles and ball
+            self.step()
+
+            # set count of updates
+            clock.tick(FRAMES_PER_SECOND)
+
+        self._draw_game_over_screen()
+
+        while pygame_is_active():
+            # check for events
+            for event in get_event():
+                # clicking quit button of window kills the game
+                if event.type == QUIT:
+                    quit_pygame()
+
+
+if __name__ == '__main__':
+    PongArena().run()
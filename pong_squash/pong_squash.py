@@ -1,5 +1,9 @@
 # Sebastian Thomas (coding at sebastianthomas dot de)
 
+# operating system
+from os.path import abspath, dirname
+from sys import path as module_paths
+
 # randomization
 from random import choice
 
@@ -7,14 +11,19 @@ from random import choice
 from pygame import init as init_pygame, quit as quit_pygame, \
     get_init as pygame_is_active
 from pygame.constants import QUIT, KEYDOWN, K_LEFT, K_RIGHT
-from pygame.display import set_mode as set_mode_of_screen, \
-    flip as flip_screen, set_caption as set_caption_of_screen
+from pygame.display import set_caption as set_caption_of_screen
 from pygame.font import init as init_pygame_fonts, SysFont
 from pygame.rect import Rect
 from pygame.draw import circle as draw_circle, rect as draw_rect
 from pygame.event import get as get_event
 from pygame.time import Clock, wait
 
+# display shared with two player pong, which is found next to the directory
+# of this module when it is run as a script
+if not __package__:
+    module_paths.insert(0, dirname(dirname(abspath(__file__))))
+from pong.pong import ScaledDisplay
+
 
 # constants
 FRAMES_PER_SECOND = 120
@@ -25,7 +34,9 @@ WINDOW_HEIGHT = 480
 WINDOW_COLOR = 0, 0, 0  # black
 
 init_pygame_fonts()
-FONT = SysFont('couriernewbold', 70, bold=False)
+FONT_NAME = 'couriernewbold'
+FONT_SIZE = 70
+FONT = SysFont(FONT_NAME, FONT_SIZE, bold=False)
 FONT_COLOR = 255, 255, 255  # white
 
 SHOTS_LABEL_POSITION \
@@ -151,12 +162,31 @@ class PongSquash:
             """Returns the color of this instance."""
             return self._color
 
-    def __init__(self):
-        """Initializes single player variant of Pong game."""
+    def __init__(self, on_frame=None, offscreen=False, display_size=None):
+        """Initializes single player variant of Pong game. If given, on_frame
+        is called with the instance after each time step. If offscreen is
+        true, the instance is drawn on a surface that is not shown in a
+        window. Otherwise, it is drawn at the size of the constants and shown
+        scaled to the display size, if given."""
         init_pygame()
-        self._screen = set_mode_of_screen(size=(WINDOW_WIDTH, WINDOW_HEIGHT))
-        set_caption_of_screen('1-Player Pong')
-
+        self._is_offscreen = offscreen
+        if offscreen:
+            display_size = None
+        elif display_size is None:
+            display_size = WINDOW_WIDTH, WINDOW_HEIGHT
+        self._display = ScaledDisplay((WINDOW_WIDTH, WINDOW_HEIGHT),
+                                      display_size)
+        self._screen = self._display.surface
+        if not offscreen:
+            set_caption_of_screen('1-Player Pong')
+
+        self._on_frame = on_frame
+
+        self.restart()
+
+    def restart(self):
+        """Restarts the game with the initial paddle, ball, shots and
+        lives."""
         self._paddle = self.Paddle(PADDLE_INITIAL_LEFT)
         self._ball = self.Ball(velocity=(choice(BALL_VELOCITY_CHOICES),
                                          choice(BALL_VELOCITY_CHOICES)))
@@ -164,9 +194,25 @@ class PongSquash:
         self._n_lives = 3
 
     @property
-    def _label(self):
-        return FONT.render('Shots:  {:4d}'.format(self._shots), True,
-                           FONT_COLOR)
+    def is_active(self):
+        """Checks whether the game is still running."""
+        return self._n_lives > 0
+
+    @property
+    def screen(self):
+        """Returns the surface this instance is drawn on."""
+        return self._screen
+
+    @property
+    def state(self):
+        """Returns the left of the paddle, the rectangle of the ball, the
+        shots and the number of lives as a tuple of integers."""
+        return (self._paddle.left, *self._ball, self._shots, self._n_lives)
+
+    def _draw_label(self):
+        """Draws the label of the shots."""
+        self._display.draw_text('Shots:  {:4d}'.format(self._shots),
+                                SHOTS_LABEL_POSITION, FONT_SIZE)
 
     def _redraw_screen(self):
         """Redraws the screen."""
@@ -174,7 +220,7 @@ class PongSquash:
         self._screen.fill(WINDOW_COLOR)
 
         # draw label
-        self._screen.blit(self._label, SHOTS_LABEL_POSITION)
+        self._draw_label()
 
         # draw paddle and ball
         draw_rect(self._screen, self._paddle.color, self._paddle)
@@ -182,7 +228,7 @@ class PongSquash:
                     self._ball.radius)
 
         # update whole screen
-        flip_screen()
+        self._display.flip()
 
     def _move_paddle_and_ball(self):
         """Updates coordinates of the paddle and the ball to the values after
@@ -231,6 +277,33 @@ class PongSquash:
             if self._paddle.left <= self._ball.center_x <= self._paddle.right:
                 self._ball.bottom = self._paddle.top
 
+    def steer(self, velocity):
+        """Sets the velocity of the paddle, limited to the maximal
+        velocity."""
+        self._paddle.velocity = max(-MAX_VELOCITY, min(velocity, MAX_VELOCITY))
+
+    def step(self):
+        """Updates the paddle and the ball by one time step."""
+        # update coordinates of paddle and ball
+        self._move_paddle_and_ball()
+
+        # handle collisions of paddle with walls and of ball with walls and
+        # paddle
+        self._handle_wall_collision()
+        self._handle_paddle_ball_collision()
+
+        # notify observer of the new state
+        if self._on_frame is not None:
+            self._on_frame(self)
+
+    def render(self):
+        """Draws the current frame on the screen, or the game over screen
+        once the game is over."""
+        if self.is_active:
+            self._redraw_screen()
+        else:
+            self._draw_game_over_screen()
+
     def _reset(self):
         """Resets the properties of the paddle and of the ball to their
         initial values, respectively, and redraws the screen."""
@@ -248,8 +321,9 @@ class PongSquash:
         # redraw screen
         self._redraw_screen()
 
-        # wait until game continues
-        wait(RESTART_TIME)
+        # wait until game continues, unless nobody is watching
+        if not self._is_offscreen:
+            wait(RESTART_TIME)
 
     def _draw_game_over_screen(self):
         """Draws the game over screen."""
@@ -257,22 +331,23 @@ class PongSquash:
         self._screen.fill(WINDOW_COLOR)
 
         # draw label
-        self._screen.blit(self._label, SHOTS_LABEL_POSITION)
+        self._draw_label()
 
         # draw game over label
-        self._screen.blit(GAME_OVER_LABEL, GAME_OVER_LABEL_POSITION)
+        self._display.draw_text('GAME OVER', GAME_OVER_LABEL_POSITION,
+                                FONT_SIZE)
 
         # draw paddles
         draw_rect(self._screen, self._paddle.color, self._paddle)
 
         # update whole screen
-        flip_screen()
+        self._display.flip()
 
     def run(self):
         """Runs the instance."""
         clock = Clock()
 
-        while self._n_lives > 0:
+        while self.is_active:
             # redraw screen
             self._redraw_screen()
 
@@ -291,13 +366,8 @@ class PongSquash:
                     elif event.key == K_RIGHT:
                         self._paddle.velocity = MAX_VELOCITY
 
-            # update coordinates of paddle and ball
-            self._move_paddle_and_ball()
-
-            # handle collisions of paddle with walls and of ball with
-            # walls and paddle
-            self._handle_wall_collision()
-            self._handle_paddle_ball_collision()
+            # update paddle and ball
+            self.step()
 
             # set count of updates
             clock.tick(FRAMES_PER_SECOND)
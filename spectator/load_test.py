@@ -0,0 +1,109 @@
+# Sebastian Thomas (coding at sebastianthomas dot de)
+
+# command line interface
+from argparse import ArgumentParser
+
+# asynchronous networking
+from asyncio import IncompleteReadError, Semaphore, TimeoutError, gather, \
+    open_connection, run, wait_for
+
+# time measurement
+from time import perf_counter
+
+# spectator protocol
+from spectator.spectator import HANDSHAKE, HEADER, HOST, PORT, payload_size
+
+
+# constants
+N_SPECTATORS = 10000
+DURATION = 10  # seconds
+MAX_PENDING_CONNECTIONS = 500
+
+
+class LoadTester:
+    """Connects many spectators to a spectator server and measures what each
+    of them receives."""
+
+    def __init__(self, n_spectators=N_SPECTATORS, host=HOST, port=PORT):
+        """Initializes load tester."""
+        self._n_spectators = n_spectators
+        self._host = host
+        self._port = port
+
+        self._n_connected = 0
+        self._n_failed = 0  # connections refused or reset
+        self._n_bytes = 0
+        self._n_frames = 0
+        self._n_skipped = 0
+
+    async def _spectate(self, connecting, duration):
+        """Connects one spectator and reads its stream for duration
+        seconds."""
+        async with connecting:
+            try:
+                reader, writer = await open_connection(self._host,
+                                                       self._port)
+            except OSError:
+                self._n_failed += 1
+                return
+        self._n_connected += 1
+
+        async def read():
+            await reader.readexactly(HANDSHAKE.size)
+            self._n_bytes += HANDSHAKE.size
+            last_frame = None
+            while True:
+                frame, mask = HEADER.unpack(
+                    await reader.readexactly(HEADER.size))
+                size = payload_size(mask)
+                await reader.readexactly(size)
+                self._n_bytes += HEADER.size + size
+                self._n_frames += 1
+                if last_frame is not None:
+                    self._n_skipped += frame - last_frame - 1
+                last_frame = frame
+
+        try:
+            await wait_for(read(), duration)
+        except (TimeoutError, IncompleteReadError):
+            pass
+        except OSError:
+            self._n_failed += 1
+        finally:
+            writer.close()
+
+    async def run(self, duration=DURATION):
+        """Runs the load test and returns its report."""
+        connecting = Semaphore(MAX_PENDING_CONNECTIONS)
+        start = perf_counter()
+        await gather(*(self._spectate(connecting, duration)
+                       for _ in range(self._n_spectators)))
+        elapsed = perf_counter() - start
+
+        n_connected = max(self._n_connected, 1)
+        return {
+            'spectators': self._n_connected,
+            'failed_connections': self._n_failed,
+            'seconds': elapsed,
+            'bytes_per_second_per_spectator':
+                self._n_bytes / n_connected / duration,
+            'frames_per_second_per_spectator':
+                self._n_frames / n_connected / duration,
+            'skipped_frames_per_spectator': self._n_skipped / n_connected,
+        }
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Measures the bandwidth per spectator'
+                                        ' of a running spectator server.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--spectators', type=int, default=N_SPECTATORS)
+    parser.add_argument('--duration', type=float, default=DURATION,
+                        help='seconds each spectator stays connected')
+    args = parser.parse_args()
+
+    report = run(LoadTester(args.spectators, args.host, args.port)
+                 .run(args.duration))
+    for key, value in report.items():
+        print('{:>32}: {:.2f}'.format(key, value))
@@ -0,0 +1,240 @@
+# Sebastian Thomas (coding at sebastianthomas dot de)
+
+# command line interface
+from argparse import ArgumentParser
+
+# asynchronous networking
+from asyncio import all_tasks, current_task, gather, new_event_loop, \
+    run_coroutine_threadsafe, sleep, start_server
+
+# binary encoding
+from struct import Struct
+
+# threading
+from threading import Event, Thread
+
+
+# constants
+HOST = '127.0.0.1'
+PORT = 8765
+BROADCASTS_PER_SECOND = 30
+# bytes that may be queued for a spectator before frames are dropped for it
+HIGH_WATER_MARK = 16 * 1024
+BACKLOG = 4096
+
+# a handshake announces the number of fields of a state, every following
+# message consists of a header and the deltas of the changed fields
+HANDSHAKE = Struct('<B')
+HEADER = Struct('<IH')  # frame number, mask of changed fields
+WIDE_FLAG = 1 << 15  # deltas are packed as shorts instead of bytes
+MAX_N_FIELDS = 15
+
+
+def encode_diff(frame, base, state):
+    """Returns the packed message that turns the state base into the state
+    state."""
+    mask = 0
+    deltas = []
+    for index, (old, new) in enumerate(zip(base, state)):
+        if old != new:
+            mask |= 1 << index
+            deltas.append(new - old)
+
+    if all(-128 <= delta <= 127 for delta in deltas):
+        payload = bytes(delta & 0xff for delta in deltas)
+    else:
+        mask |= WIDE_FLAG
+        payload = Struct('<{}h'.format(len(deltas))).pack(*deltas)
+
+    return HEADER.pack(frame, mask) + payload
+
+
+def payload_size(mask):
+    """Returns the size of the payload following a header with the given
+    mask."""
+    return (bin(mask & ~WIDE_FLAG).count('1')
+            * (2 if mask & WIDE_FLAG else 1))
+
+
+def decode_diff(mask, payload, base):
+    """Returns the state obtained by applying the payload of a message with
+    the given mask to the state base."""
+    n_deltas = bin(mask & ~WIDE_FLAG).count('1')
+    deltas = iter(Struct('<{}{}'.format(n_deltas,
+                                        'h' if mask & WIDE_FLAG else 'b'))
+                  .unpack(payload))
+    return tuple(value + next(deltas) if mask & (1 << index) else value
+                 for index, value in enumerate(base))
+
+
+async def receive_states(reader):
+    """Yields the frame numbers and states sent by a spectator server."""
+    (n_fields,) = HANDSHAKE.unpack(await reader.readexactly(HANDSHAKE.size))
+    state = (0,) * n_fields
+    while True:
+        frame, mask = HEADER.unpack(await reader.readexactly(HEADER.size))
+        state = decode_diff(mask, await reader.readexactly(payload_size(mask)),
+                            state)
+        yield frame, state
+
+
+class SpectatorServer:
+    """Asyncio server that broadcasts the state of a running game to
+    spectators.
+
+    The game publishes its state once per frame; the server sends each
+    spectator the delta to the last state it received at a fixed rate. A
+    spectator whose socket does not keep up skips frames instead of stalling
+    the game or the other spectators."""
+
+    def __init__(self, n_fields, host=HOST, port=PORT,
+                 rate=BROADCASTS_PER_SECOND, high_water_mark=HIGH_WATER_MARK):
+        """Initializes spectator server for states with n_fields integer
+        fields."""
+        if not 0 < n_fields <= MAX_N_FIELDS:
+            raise ValueError('number of fields must be between 1 and {}'
+                             .format(MAX_N_FIELDS))
+
+        self._n_fields = n_fields
+        self._host = host
+        self._port = port
+        self._interval = 1 / rate
+        self._high_water_mark = high_water_mark
+
+        self._state = (0,) * n_fields
+        # last broadcast state and its frame number
+        self._broadcast_state = None
+        self._frame = 0
+        # maps the writer of each spectator to the last state sent to it
+        self._spectators = {}
+        self._n_dropped = 0
+
+        self._loop = None
+        self._thread = None
+        self._task = None
+        self._is_serving = Event()
+
+    @property
+    def n_spectators(self):
+        """Returns the number of connected spectators."""
+        return len(self._spectators)
+
+    @property
+    def n_dropped(self):
+        """Returns the number of frames dropped for slow spectators."""
+        return self._n_dropped
+
+    def publish(self, state):
+        """Updates the state to be broadcast. Never blocks, so it may be
+        called from the game loop in any thread."""
+        self._state = tuple(state)
+
+    def publish_game(self, game):
+        """Updates the state to be broadcast to the state of the game. Meant
+        to be passed as on_frame to Pong or PongSquash."""
+        self.publish(game.state)
+
+    async def _handle_spectator(self, reader, writer):
+        """Registers a spectator until it disconnects."""
+        writer.write(HANDSHAKE.pack(self._n_fields))
+        self._spectators[writer] = (0,) * self._n_fields
+        try:
+            # spectators do not send anything, wait for end of stream
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            del self._spectators[writer]
+            writer.close()
+
+    def _broadcast(self, state):
+        """Sends the deltas to the state to all spectators that have not
+        received it yet and are not congested. Spectators that were skipped
+        or connected late catch up with the next broadcast."""
+        if state is not self._broadcast_state:
+            self._broadcast_state = state
+            self._frame += 1
+        # most spectators share the same base, so encode each diff only once
+        messages = {}
+        for writer, base in self._spectators.items():
+            if base == state:
+                continue
+            if writer.transport.get_write_buffer_size() \
+                    > self._high_water_mark:
+                self._n_dropped += 1
+                continue
+            message = messages.get(base)
+            if message is None:
+                message = messages[base] \
+                    = encode_diff(self._frame, base, state)
+            writer.write(message)
+            self._spectators[writer] = state
+
+    async def serve(self):
+        """Serves spectators until cancelled."""
+        server = await start_server(self._handle_spectator, self._host,
+                                    self._port, backlog=BACKLOG)
+        self._is_serving.set()
+
+        async with server:
+            loop = server.get_loop()
+            next_time = loop.time()
+            while True:
+                next_time += self._interval
+                await sleep(max(0., next_time - loop.time()))
+                self._broadcast(self._state)
+
+    def start(self):
+        """Starts serving in a background thread and returns once the server
+        accepts connections."""
+        self._loop = new_event_loop()
+        self._thread = Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._task = run_coroutine_threadsafe(self.serve(), self._loop)
+        while not self._is_serving.wait(0.1):
+            if self._task.done():
+                # re-raise error of server, e.g. port already in use
+                self._task.result()
+
+    async def _shutdown(self):
+        """Closes the connections of the spectators, cancels serving and
+        waits until all tasks are finished, which closes the listening
+        socket."""
+        for writer in self._spectators:
+            writer.close()
+        self._task.cancel()
+        await gather(*all_tasks() - {current_task()},
+                     return_exceptions=True)
+
+    def stop(self):
+        """Stops serving and the background thread once all connections are
+        closed."""
+        run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._is_serving.clear()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Runs a game whose state is broadcast'
+                                        ' to spectators.')
+    parser.add_argument('game', choices=('pong', 'pong_squash'))
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--rate', type=float, default=BROADCASTS_PER_SECOND,
+                        help='broadcasts per second')
+    args = parser.parse_args()
+
+    if args.game == 'pong':
+        from pong.pong import Pong as Game
+    else:
+        from pong_squash.pong_squash import PongSquash as Game
+
+    server = None
+    game = Game(on_frame=lambda instance: server.publish_game(instance))
+    server = SpectatorServer(len(game.state), args.host, args.port,
+                             args.rate)
+    server.start()
+    game.run()
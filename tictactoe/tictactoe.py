@@ -10,6 +10,8 @@ from itertools import product as cart
 class TicTacToe:
     """Implements the classical tic-tac-toe game."""
 
+    TITLE = 'TicTacToe'
+
     def __init__(self):
         """Initializes tic-tac-toe game."""
         self._board: list[list[Union[None, bool]]] = [[None]*3
@@ -117,8 +119,8 @@ class TicTacToe:
 
     def run(self):
         """Runs the game."""
-        print('TicTacToe')
-        print('---------\n')
+        print(self.TITLE)
+        print('-' * len(self.TITLE) + '\n')
 
         self._print_board()
 
@@ -0,0 +1,307 @@
+# Sebastian Thomas (coding at sebastianthomas dot de)
+
+# command line interface
+from argparse import ArgumentParser
+
+# serialization
+from json import dumps, loads
+
+# iteration
+from itertools import permutations, product as cart
+
+# parallelization
+from multiprocessing import Pool, cpu_count
+
+# operating system
+from os import environ
+from os.path import exists
+
+# randomization
+from random import seed
+
+# time measurement
+from time import perf_counter
+
+
+# constants
+MAX_FRAMES = 20000  # frames after which a game is stopped
+N_REPETITIONS = 2
+INITIAL_RATING = 1500
+K_FACTOR = 32
+RESULTS_FILE = 'tournament_results.jsonl'
+
+DEFAULT_GRID = {
+    'speed': [1, 3, 5],
+    'dead_zone': [0, 20],
+    'reaction_frames': [1, 8],
+}
+
+
+class TrackingAgent:
+    """Agent that moves its paddle towards the center of the ball.
+
+    The agent moves with the given speed, tolerates offsets up to the dead
+    zone and only reconsiders its decision every reaction_frames frames."""
+
+    def __init__(self, speed=5, dead_zone=0, reaction_frames=1):
+        """Initializes agent."""
+        self._speed = speed
+        self._dead_zone = dead_zone
+        self._reaction_frames = reaction_frames
+
+        self._velocity = 0
+        self._n_frames = 0
+
+    def act(self, paddle_center, ball_center):
+        """Returns the velocity of the paddle for the next frame."""
+        if self._n_frames % self._reaction_frames == 0:
+            offset = ball_center - paddle_center
+            if offset > self._dead_zone:
+                self._velocity = self._speed
+            elif offset < -self._dead_zone:
+                self._velocity = -self._speed
+            else:
+                self._velocity = 0
+        self._n_frames += 1
+        return self._velocity
+
+
+def configurations(grid):
+    """Returns all agent configurations of the grid, which maps parameter
+    names to lists of values."""
+    return [dict(zip(grid, values)) for values in cart(*grid.values())]
+
+
+def matches(game_names, n_configurations, n_repetitions=N_REPETITIONS):
+    """Returns all matches, i.e. tuples of game name, indices of two
+    configurations and repetition."""
+    return [(game_name, first, second, repetition)
+            for game_name in game_names
+            for first, second in permutations(range(n_configurations), 2)
+            for repetition in range(n_repetitions)]
+
+
+def match_id(match):
+    """Returns the identifier of the match in the results file."""
+    return '{}:{}:{}:{}'.format(*match)
+
+
+def configuration_key(configuration):
+    """Returns a canonical representation of the configuration, which does
+    not depend on the order of its parameters."""
+    return dumps(configuration, sort_keys=True)
+
+
+def play(game, first_agent, second_agent=None, max_frames=MAX_FRAMES):
+    """Lets the agents steer the game until it is over or max_frames frames
+    have passed and returns the number of frames played. In Pong, the first
+    agent plays on the left; PongSquash is played by the first agent
+    alone."""
+    from pong.pong import PADDLE_HEIGHT
+    from pong_squash.pong_squash import PongSquash, PADDLE_WIDTH
+
+    n_frames = 0
+    while game.is_active and n_frames < max_frames:
+        if isinstance(game, PongSquash):
+            paddle_left, left, top, width, height, _, _ = game.state
+            game.steer(first_agent.act(paddle_left + PADDLE_WIDTH // 2,
+                                       left + width // 2))
+        else:
+            top1, top2, left, top, width, height, _, _ = game.state
+            ball_center = top + height // 2
+            game.steer(
+                first_agent.act(top1 + PADDLE_HEIGHT // 2, ball_center),
+                second_agent.act(top2 + PADDLE_HEIGHT // 2, ball_center))
+        game.step()
+        n_frames += 1
+    return n_frames
+
+
+# state of each worker process
+_games = {}
+_configurations = []
+_max_frames = MAX_FRAMES
+
+
+def _initialize_worker(configuration_list, max_frames):
+    """Creates the headless games of a worker process once."""
+    global _configurations, _max_frames
+
+    # workers never show a window and must not swallow the signals the pool
+    # uses to terminate them
+    environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    environ['SDL_NO_SIGNAL_HANDLERS'] = '1'
+
+    from pong.pong import Pong
+    from pong_squash.pong_squash import PongSquash
+
+    _games['pong'] = Pong(offscreen=True)
+    _games['pong_squash'] = PongSquash(offscreen=True)
+    _configurations = configuration_list
+    _max_frames = max_frames
+
+
+def _play_pong(game, first_agent, second_agent):
+    """Plays Pong with the first agent on the left and returns the score of
+    the first agent."""
+    play(game, first_agent, second_agent, _max_frames)
+    score1, score2 = game.state[-2:]
+    return 0.5 if score1 == score2 else float(score1 > score2)
+
+
+def _play_pong_squash(game, first_agent, second_agent, match_seed):
+    """Lets both agents play PongSquash with the same balls and returns the
+    score of the first agent, who wins by surviving longer."""
+    seed(match_seed)
+    game.restart()
+    frames1 = play(game, first_agent, max_frames=_max_frames)
+    seed(match_seed)
+    game.restart()
+    frames2 = play(game, second_agent, max_frames=_max_frames)
+    return 0.5 if frames1 == frames2 else float(frames1 > frames2)
+
+
+def _play_match(match):
+    """Plays the match in a worker process and returns its result."""
+    game_name, first, second, repetition = match
+    game = _games[game_name]
+    first_agent = TrackingAgent(**_configurations[first])
+    second_agent = TrackingAgent(**_configurations[second])
+    # seeding with the identifier makes every match reproducible
+    match_seed = match_id(match)
+
+    if game_name == 'pong':
+        seed(match_seed)
+        game.restart()
+        score = _play_pong(game, first_agent, second_agent)
+    else:
+        score = _play_pong_squash(game, first_agent, second_agent, match_seed)
+
+    return {'match': match_id(match), 'game': game_name, 'first': first,
+            'second': second, 'repetition': repetition,
+            'first_configuration': _configurations[first],
+            'second_configuration': _configurations[second],
+            'score': score}
+
+
+def elo_ratings(results, n_configurations):
+    """Returns the Elo ratings of the configurations after the results,
+    which are rated in the order of their match identifiers, so that the
+    ratings do not depend on the order in which the matches finished."""
+    ratings = [INITIAL_RATING] * n_configurations
+    for result in sorted(results, key=lambda result: result['match']):
+        first, second = result['first'], result['second']
+        expected = 1 / (1 + 10 ** ((ratings[second] - ratings[first]) / 400))
+        change = K_FACTOR * (result['score'] - expected)
+        ratings[first] += change
+        ratings[second] -= change
+    return ratings
+
+
+def read_results(path):
+    """Returns the results stored in the results file, if it exists."""
+    if not exists(path):
+        return []
+    with open(path) as file:
+        return [loads(line) for line in file if line.strip()]
+
+
+def current_results(results, game_names, configuration_list):
+    """Returns the results of matches between the configurations in the
+    games, with the indices and identifiers of the matches renumbered to
+    the configuration list. Results of other games or configurations, e.g.
+    from a tournament with a different grid, are dropped."""
+    indices = {configuration_key(configuration): idx
+               for idx, configuration in enumerate(configuration_list)}
+
+    current = []
+    for result in results:
+        first = indices.get(configuration_key(
+            result.get('first_configuration')))
+        second = indices.get(configuration_key(
+            result.get('second_configuration')))
+        if (result['game'] in game_names and first is not None
+                and second is not None and 'repetition' in result):
+            match = (result['game'], first, second, result['repetition'])
+            current.append(dict(result, match=match_id(match), first=first,
+                                second=second))
+    return current
+
+
+class Tournament:
+    """Plays all pairings of a grid of agent configurations in a pool of
+    worker processes, each with its own headless games.
+
+    Results are appended to a results file as soon as they arrive, so an
+    interrupted tournament resumes with the matches that are missing.
+    Results of other games or configurations in the file are ignored."""
+
+    def __init__(self, grid=None, game_names=('pong', 'pong_squash'),
+                 n_repetitions=N_REPETITIONS, results_path=RESULTS_FILE,
+                 n_processes=None, max_frames=MAX_FRAMES):
+        """Initializes tournament."""
+        self._configurations = configurations(DEFAULT_GRID if grid is None
+                                              else grid)
+        self._game_names = game_names
+        self._matches = matches(game_names, len(self._configurations),
+                                n_repetitions)
+        self._results_path = results_path
+        self._n_processes = n_processes or cpu_count()
+        self._max_frames = max_frames
+
+    def run(self):
+        """Plays all missing matches and returns the results, the ratings
+        and the throughput in matches per second per process."""
+        results = current_results(read_results(self._results_path),
+                                  self._game_names, self._configurations)
+        done = {result['match'] for result in results}
+        missing = [match for match in self._matches
+                   if match_id(match) not in done]
+
+        start = perf_counter()
+        with Pool(self._n_processes, _initialize_worker,
+                  (self._configurations, self._max_frames)) as pool, \
+                open(self._results_path, 'a') as file:
+            chunksize = max(1, len(missing) // (8 * self._n_processes))
+            for result in pool.imap_unordered(_play_match, missing,
+                                              chunksize):
+                file.write(dumps(result) + '\n')
+                file.flush()
+                results.append(result)
+            pool.close()
+            pool.join()
+        elapsed = perf_counter() - start
+
+        throughput = len(missing) / elapsed / self._n_processes
+        return (results,
+                elo_ratings(results, len(self._configurations)),
+                throughput)
+
+    def print_report(self):
+        """Runs the tournament and prints the ratings and the
+        throughput."""
+        results, ratings, throughput = self.run()
+
+        print('{} matches, {:.2f} matches per second per process'
+              .format(len(results), throughput))
+        ranking = sorted(range(len(ratings)), key=lambda idx: -ratings[idx])
+        for idx in ranking:
+            print('{:7.1f}  {}'.format(ratings[idx],
+                                       self._configurations[idx]))
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Plays a tournament of Pong agents.')
+    parser.add_argument('--grid', type=loads, default=None,
+                        help='JSON object mapping agent parameters to lists '
+                             'of values')
+    parser.add_argument('--games', nargs='+', default=['pong', 'pong_squash'],
+                        choices=('pong', 'pong_squash'))
+    parser.add_argument('--repetitions', type=int, default=N_REPETITIONS)
+    parser.add_argument('--results', default=RESULTS_FILE)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES)
+    args = parser.parse_args()
+
+    Tournament(args.grid, args.games, args.repetitions, args.results,
+               args.processes, args.max_frames).print_report()
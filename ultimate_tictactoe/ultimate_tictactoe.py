@@ -0,0 +1,182 @@
+# Sebastian Thomas (coding at sebastianthomas dot de)
+
+# type hints
+from typing import NoReturn, Union
+
+# classical tic-tac-toe
+from tictactoe.tictactoe import TicTacToe
+
+
+# constants
+FULL = 0b111111111  # mask of all nine cells of a board
+
+# masks of the rows, columns and diagonals of a board
+LINES = (0b000000111, 0b000111000, 0b111000000,
+         0b001001001, 0b010010010, 0b100100100,
+         0b100010001, 0b001010100)
+# whether a mask of a board contains a line, for each of the 512 masks
+WINS = tuple(any(mask & line == line for line in LINES)
+             for mask in range(FULL + 1))
+# indices of the cells set in a mask, for each of the 512 masks
+BITS = tuple(tuple(idx for idx in range(9) if mask >> idx & 1)
+             for mask in range(FULL + 1))
+
+
+class UltimateTicTacToe(TicTacToe):
+    """Implements ultimate tic-tac-toe, played on a 3x3 grid of tic-tac-toe
+    boards. The cell of a move selects the board of the next move; if that
+    board is won or full, the next move may go to any open board. Winning
+    three boards in a line wins the game.
+
+    Each board is stored as a 9-bit mask per player, so that checking a
+    board for a win is a lookup in a precomputed table, and the legal moves
+    follow from masks of free cells that are updated with every move. Moves
+    are encoded as board * 9 + cell with 0-based indices."""
+
+    TITLE = 'Ultimate TicTacToe'
+
+    def __init__(self):
+        """Initializes ultimate tic-tac-toe game."""
+        super().__init__()
+        # masks of the cells of each board, per player
+        self._boards: list[list[int]] = [[0]*9, [0]*9]
+        # masks of the free cells of each board
+        self._free: list[int] = [FULL]*9
+        # masks of the boards won, per player, and of boards won or full
+        self._meta: list[int] = [0, 0]
+        self._closed = 0
+        # board of the next move, None if any open board may be chosen
+        self._active_board: Union[None, int] = None
+        # moves and the active boards before them
+        self._history: list[tuple[int, Union[None, int]]] = []
+
+    @property
+    def _player(self) -> int:
+        """Returns the index of the active player."""
+        return 0 if self._first_player_active else 1
+
+    def _is_open(self, board: int) -> bool:
+        """Checks whether the board is neither won nor full."""
+        return not self._closed >> board & 1
+
+    def legal_moves(self) -> list[int]:
+        """Returns the legal moves of the active player."""
+        if self._is_finished:
+            return []
+        boards = ((self._active_board,) if self._active_board is not None
+                  else BITS[FULL & ~self._closed])
+        return [board*9 + cell for board in boards
+                for cell in BITS[self._free[board]]]
+
+    def _char(self, board: int, cell: int) -> str:
+        """Returns the character of the cell of the board."""
+        if self._boards[0][board] >> cell & 1:
+            return 'X'
+        if self._boards[1][board] >> cell & 1:
+            return 'O'
+        if self._is_open(board) and self._active_board in (None, board):
+            return str(cell + 1)
+        return '.'
+
+    def _print_board(self) -> NoReturn:
+        """Prints the boards, showing the positions of the free cells of the
+        boards the active player may choose."""
+        lines = []
+        for row_idx in range(9):
+            if row_idx and row_idx % 3 == 0:
+                lines.append('------+-------+------')
+            board_row_idx, cell_row_idx = divmod(row_idx, 3)
+            lines.append(' | '.join(
+                ' '.join(self._char(board_row_idx*3 + board_col_idx,
+                                    cell_row_idx*3 + cell_col_idx)
+                         for cell_col_idx in range(3))
+                for board_col_idx in range(3)))
+        print('\n'.join(lines))
+
+    def _parse(self, pos_rep: str) -> Union[None, int]:
+        """Returns the move of the user input, i.e. the position of a board
+        followed by the position of a cell, or only the position of a cell
+        if the board is determined, or None if the input is no legal
+        move."""
+        if not pos_rep.isdigit() or '0' in pos_rep:
+            return None
+        if len(pos_rep) == 2:
+            board, cell = int(pos_rep[0]) - 1, int(pos_rep[1]) - 1
+        elif len(pos_rep) == 1 and self._active_board is not None:
+            board, cell = self._active_board, int(pos_rep) - 1
+        else:
+            return None
+
+        if (self._is_open(board) and self._active_board in (None, board)
+                and self._free[board] >> cell & 1):
+            return board*9 + cell
+        return None
+
+    def _is_valid(self, pos_rep: str) -> bool:
+        """Checks whether the user input is valid."""
+        return self._parse(pos_rep) is not None
+
+    def _ask_for_position(self) -> int:
+        """Asks the user for a move."""
+        while True:
+            if self._active_board is None:
+                question = 'Player {}, on which board and where will you ' \
+                           'play? '
+            else:
+                question = 'Player {{}}, where on board {} will you play? ' \
+                    .format(self._active_board + 1)
+            pos_rep = input(question.format(
+                '1 (X)' if self._first_player_active else '2 (O)'))
+            pos = self._parse(pos_rep)
+            if pos is not None:
+                return pos
+            else:
+                print('Invalid input!')
+
+    def _update_board(self, pos: int) -> NoReturn:
+        """Updates the boards with the move."""
+        board, cell = divmod(pos, 9)
+        player = self._player
+        self._history.append((pos, self._active_board))
+
+        self._boards[player][board] |= 1 << cell
+        self._free[board] &= ~(1 << cell)
+        if WINS[self._boards[player][board]]:
+            self._meta[player] |= 1 << board
+            self._closed |= 1 << board
+        elif not self._free[board]:
+            self._closed |= 1 << board
+
+        self._active_board = cell if self._is_open(cell) else None
+
+    def _is_won(self, pos: int) -> bool:
+        """Checks whether the game is finished with a win."""
+        return WINS[self._meta[self._player]]
+
+    def _is_tie(self) -> bool:
+        """Checks whether the game is finished with a tie."""
+        return self._closed == FULL
+
+    def play(self, pos: int) -> NoReturn:
+        """Plays the legal move for the active player."""
+        self._update_board(pos)
+        self._update_status(pos)
+        self._first_player_active = not self._first_player_active
+
+    def undo(self) -> NoReturn:
+        """Takes back the last move."""
+        pos, self._active_board = self._history.pop()
+        self._first_player_active = not self._first_player_active
+        self._status = (False, False)
+
+        # the board was open before the move, so the move closed it if it is
+        # closed now
+        board, cell = divmod(pos, 9)
+        self._boards[self._player][board] &= ~(1 << cell)
+        self._free[board] |= 1 << cell
+        self._meta[self._player] &= ~(1 << board)
+        self._closed &= ~(1 << board)
+
+
+if __name__ == '__main__':
+    UltimateTicTacToe().run()
@@ -0,0 +1,211 @@
+# Sebastian Thomas (coding at sebastianthomas dot de)
+
+# operating system
+from os import environ
+
+# rendering never shows a window
+environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+# command line interface
+from argparse import ArgumentParser
+
+# serialization
+from json import dump, loads
+
+# exact frame rates
+from fractions import Fraction
+
+# queueing and threading
+from queue import Queue
+from threading import Thread
+
+# randomization
+from random import seed
+
+# subprocesses
+from shutil import which
+from subprocess import DEVNULL, PIPE, Popen
+
+# time measurement
+from time import perf_counter
+
+# python gaming framework
+from pygame.image import tobytes
+
+# games and agents
+from pong.pong import Pong, FRAMES_PER_SECOND
+from pong_squash.pong_squash import PongSquash
+from tournament.tournament import TrackingAgent, play
+
+
+# constants
+VIDEO_FRAMES_PER_SECOND = 30
+QUEUE_SIZE = 64  # frames buffered between rendering and encoding
+MAX_FRAMES = 10 * 60 * FRAMES_PER_SECOND  # ten minutes of game time
+
+
+class VideoExporter:
+    """Writes frames to a video file in a background thread.
+
+    Frames are copied into a bounded queue, from which an encoder thread
+    pipes them to ffmpeg. Without ffmpeg, the raw RGB frames are written one
+    after another to path + '.rgb', and their size and frame rate to
+    path + '.rgb.json', so that they can be encoded later. Meant to be used
+    as context manager."""
+
+    def __init__(self, path, size, fps=VIDEO_FRAMES_PER_SECOND,
+                 queue_size=QUEUE_SIZE):
+        """Initializes video exporter for frames of the given size."""
+        self._path = path
+        self._size = size
+        self._fps = fps
+        self._queue = Queue(queue_size)
+        self._thread = None
+        self._error = None
+        self._n_frames = 0
+
+    @property
+    def n_frames(self):
+        """Returns the number of frames written."""
+        return self._n_frames
+
+    @property
+    def path(self):
+        """Returns the path of the written file."""
+        return self._path
+
+    def _frames(self):
+        """Yields the queued frames until the end of the video."""
+        while (frame := self._queue.get()) is not None:
+            yield frame
+
+    def _pipe_to_ffmpeg(self, ffmpeg, frames):
+        """Encodes the frames with ffmpeg."""
+        process = Popen([ffmpeg, '-y', '-loglevel', 'error',
+                         '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                         '-s', '{}x{}'.format(*self._size),
+                         '-r', str(self._fps), '-i', '-',
+                         '-pix_fmt', 'yuv420p', self._path],
+                        stdin=PIPE, stdout=DEVNULL)
+        try:
+            for frame in frames:
+                process.stdin.write(frame)
+        finally:
+            process.stdin.close()
+            process.wait()
+        if process.returncode:
+            raise OSError('ffmpeg exited with code {}'
+                          .format(process.returncode))
+
+    def _write_raw(self, frames):
+        """Writes the raw frames and a sidecar file with their format."""
+        self._path += '.rgb'
+        with open(self._path + '.json', 'w') as file:
+            dump({'width': self._size[0], 'height': self._size[1],
+                  'pix_fmt': 'rgb24', 'fps': str(self._fps)}, file)
+        with open(self._path, 'wb') as file:
+            for frame in frames:
+                file.write(frame)
+
+    def _encode(self):
+        """Writes the queued frames until the end of the video."""
+        frames = self._frames()
+        try:
+            ffmpeg = which('ffmpeg')
+            if ffmpeg is None:
+                self._write_raw(frames)
+            else:
+                self._pipe_to_ffmpeg(ffmpeg, frames)
+        except Exception as error:
+            self._error = error
+        finally:
+            # keep consuming, so that the producer never blocks
+            for _ in frames:
+                pass
+
+    def write(self, surface):
+        """Queues a copy of the pixels of the surface as next frame. Blocks
+        only while the queue is full."""
+        self._queue.put(tobytes(surface, 'RGB'))
+        self._n_frames += 1
+
+    def __enter__(self):
+        """Starts the encoder thread."""
+        self._thread = Thread(target=self._encode)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Waits until all frames are written and raises the error of the
+        encoder thread, if any."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None and exc_type is None:
+            raise self._error
+
+
+def export_match(game_name, path, first=None, second=None,
+                 max_frames=MAX_FRAMES, fps=VIDEO_FRAMES_PER_SECOND,
+                 match_seed=None):
+    """Simulates a match of tracking agents with the given configurations
+    as fast as possible and exports it as video of the game time, rendering
+    every n-th frame of the game for the frame rate closest to fps. In
+    PongSquash, only the first agent plays. Returns the exporter."""
+    if fps <= 0:
+        raise ValueError('frame rate must be positive, got {}'.format(fps))
+    steps_per_frame = max(1, round(FRAMES_PER_SECOND / fps))
+
+    def write_frame(game):
+        """Renders and writes every steps_per_frame-th frame."""
+        nonlocal n_steps
+        n_steps += 1
+        if n_steps % steps_per_frame == 0:
+            game.render()
+            exporter.write(game.screen)
+
+    if match_seed is not None:
+        seed(match_seed)
+
+    n_steps = 0
+    game = (Pong if game_name == 'pong' else PongSquash)(
+        on_frame=write_frame, offscreen=True)
+
+    with VideoExporter(path, game.screen.get_size(),
+                       Fraction(FRAMES_PER_SECOND, steps_per_frame)) \
+            as exporter:
+        game.render()
+        exporter.write(game.screen)
+        play(game, TrackingAgent(**(first or {})),
+             TrackingAgent(**(second or {})), max_frames)
+        if n_steps % steps_per_frame:
+            # end the video with the final frame, e.g. the game over screen
+            game.render()
+            exporter.write(game.screen)
+
+    return exporter
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Exports a match of tracking agents '
+                                        'as video.')
+    parser.add_argument('game', choices=('pong', 'pong_squash'))
+    parser.add_argument('path', help='video file, e.g. match.mp4')
+    parser.add_argument('--first', type=loads, default={'speed': 5},
+                        help='JSON object with the configuration of the '
+                             'first agent')
+    parser.add_argument('--second', type=loads, default={'speed': 3},
+                        help='JSON object with the configuration of the '
+                             'second agent')
+    parser.add_argument('--fps', type=int, default=VIDEO_FRAMES_PER_SECOND)
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES,
+                        help='time steps after which the match is stopped')
+    parser.add_argument('--seed', default=None)
+    args = parser.parse_args()
+
+    start = perf_counter()
+    result = export_match(args.game, args.path,
+                          args.first, args.second,
+                          max_frames=args.max_frames, fps=args.fps,
+                          match_seed=args.seed)
+    print('wrote {} frames to {} in {:.1f} seconds'
+          .format(result.n_frames, result.path, perf_counter() - start))